@@ -1,93 +1,128 @@
+import sys
 import time
-import random
 import json
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from enum import IntEnum
 import numpy as np
 
-@dataclass
-class SimulatedSensor:
-    name: str
-    value: float
-    min_value: float
-    max_value: float
-    noise_level: float = 0.1
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
 
-    def read(self) -> dict:
-        noise = random.uniform(-self.noise_level, self.noise_level)
-        value = np.clip(self.value + noise, self.min_value, self.max_value)
-        return {
-            'command': self.name,
-            'value': round(value, 2),
-            'unit': self.get_unit(),
-            'timestamp': datetime.now().isoformat()
-        }
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
 
-    def get_unit(self):
-        units = {
-            'RPM': 'rpm',
-            'SPEED': 'km/h',
-            'COOLANT_TEMP': '°C',
-            'ENGINE_LOAD': '%',
-            'THROTTLE_POS': '%',
-            'INTAKE_TEMP': '°C',
-            'MAF': 'g/s',
-            'FUEL_RATE': 'L/h',
-            'OIL_TEMP': '°C',
-            'OIL_PRESSURE': 'psi'
-        }
-        return units.get(self.name, '')
+class Sensor(IntEnum):
+    RPM = 0
+    SPEED = 1
+    COOLANT_TEMP = 2
+    ENGINE_LOAD = 3
+    THROTTLE_POS = 4
+    INTAKE_TEMP = 5
+    MAF = 6
+    FUEL_RATE = 7
+    OIL_TEMP = 8
+    OIL_PRESSURE = 9
+
+NAMES = tuple(s.name for s in Sensor)
+
+UNITS = ('rpm', 'km/h', '°C', '%', '%', '°C', 'g/s', 'L/h', '°C', 'psi')
+INITIAL_VALUES = (800.0, 0.0, 85.0, 20.0, 15.0, 25.0, 5.0, 0.8, 80.0, 40.0)
+
+# Per-sensor bounds and noise levels, indexed by Sensor
+LO = np.array([0, 0, 60, 0, 0, 20, 0, 0, 60, 15], dtype=np.float64)
+HI = np.array([7000, 200, 120, 100, 100, 80, 200, 20, 120, 80], dtype=np.float64)
+NOISE = np.array([50, 2, 1, 2, 1, 0.5, 0.5, 0.1, 1, 2], dtype=np.float64)
+_NOISE_SPAN = 2 * NOISE
+for _arr in (LO, HI, NOISE, _NOISE_SPAN):
+    _arr.flags.writeable = False
+
+GEAR_RATIOS = (0.0, 3.5, 2.5, 1.8, 1.3, 1.0, 0.8)
+
+@njit(cache=True, fastmath=True)
+def _update_sensors_nb(values, throttle, gear_ratio, dt):
+    """Advance the engine physics by dt seconds in place; returns distance travelled (km)"""
+    target_rpm = 800 + (throttle * 50)
+    values[Sensor.RPM] += (target_rpm - values[Sensor.RPM]) * 0.1 * dt
+    values[Sensor.SPEED] = (values[Sensor.RPM] * gear_ratio) / 60
+    values[Sensor.ENGINE_LOAD] = throttle * 0.7
+    heat_gen = (values[Sensor.RPM] / 1000) * 0.2 + throttle * 0.05
+    cooling = (values[Sensor.COOLANT_TEMP] - 85) * 0.1
+    values[Sensor.COOLANT_TEMP] += (heat_gen - cooling) * dt
+    temp_diff = values[Sensor.COOLANT_TEMP] - values[Sensor.OIL_TEMP]
+    values[Sensor.OIL_TEMP] += temp_diff * 0.05 * dt
+    base_pressure = (values[Sensor.RPM] / 1000) * 8 + 20
+    temp_factor = 1.0 - ((values[Sensor.OIL_TEMP] - 80) / 200)
+    values[Sensor.OIL_PRESSURE] = base_pressure * min(max(temp_factor, 0.5), 1.5)
+    values[Sensor.FUEL_RATE] = (throttle / 100) * 12 + (values[Sensor.RPM] / 1000) * 0.8
+    if values[Sensor.SPEED] > 0:
+        return values[Sensor.SPEED] / 3600 * dt
+    return 0.0
 
 class VirtualCarSimulator:
+    __slots__ = ('values', 'throttle', 'gear', 'mileage', 'reading', 'reading_timestamp',
+                 '_dirty', '_rng', '_readout', '_readout_entries')
     def __init__(self):
-        self.sensors = {
-            'RPM': SimulatedSensor('RPM', 800, 0, 7000, 50),
-            'SPEED': SimulatedSensor('SPEED', 0, 0, 200, 2),
-            'COOLANT_TEMP': SimulatedSensor('COOLANT_TEMP', 85, 60, 120, 1),
-            'ENGINE_LOAD': SimulatedSensor('ENGINE_LOAD', 20, 0, 100, 2),
-            'THROTTLE_POS': SimulatedSensor('THROTTLE_POS', 15, 0, 100, 1),
-            'INTAKE_TEMP': SimulatedSensor('INTAKE_TEMP', 25, 20, 80, 0.5),
-            'MAF': SimulatedSensor('MAF', 5, 0, 200, 0.5),
-            'FUEL_RATE': SimulatedSensor('FUEL_RATE', 0.8, 0, 20, 0.1),
-            'OIL_TEMP': SimulatedSensor('OIL_TEMP', 80, 60, 120, 1),
-            'OIL_PRESSURE': SimulatedSensor('OIL_PRESSURE', 40, 15, 80, 2)
-        }
-        self.throttle = 0
+        # Sensor state is a single array indexed by Sensor
+        self.values = np.array(INITIAL_VALUES, dtype=np.float64)
+        self.throttle = 0.0
         self.gear = 3
         self.mileage = 45230.0
+        # Set by the setters; physics runs once on the next read
+        self._dirty = False
+        # Most recent noisy reading, kept numeric for the tester's history.
+        # It is overwritten in place on every read, so copy it to keep it.
+        self.reading = self.values.copy()
+        self.reading_timestamp = None
+        self._rng = np.random.default_rng()
+        # Reading dicts are built once; each read only refreshes value and timestamp
+        self._readout = {
+            name: {'command': name, 'value': 0.0, 'unit': unit, 'timestamp': None}
+            for name, unit in zip(NAMES, UNITS)
+        }
+        self._readout_entries = tuple(self._readout.values())
+        # Compile the physics kernel up front so the first tick isn't slow
+        _update_sensors_nb(self.values.copy(), 0.0, GEAR_RATIOS[1], 1.0)
     def set_throttle(self, throttle: float):
-        self.throttle = np.clip(throttle, 0, 100)
-        self._update_sensors()
+        self.throttle = 0.0 if throttle < 0 else (100.0 if throttle > 100 else float(throttle))
+        self._mark_dirty()
     def set_gear(self, gear: int):
-        self.gear = np.clip(gear, 1, 6)
-        self._update_sensors()
-    def _update_sensors(self):
-        target_rpm = 800 + (self.throttle * 50)
-        self.sensors['RPM'].value += (target_rpm - self.sensors['RPM'].value) * 0.1
-        gear_ratios = [0, 3.5, 2.5, 1.8, 1.3, 1.0, 0.8]
-        speed = (self.sensors['RPM'].value * gear_ratios[self.gear]) / 60
-        self.sensors['SPEED'].value = speed
-        self.sensors['ENGINE_LOAD'].value = self.throttle * 0.7
-        heat_gen = (self.sensors['RPM'].value / 1000) * 0.2 + self.throttle * 0.05
-        cooling = (self.sensors['COOLANT_TEMP'].value - 85) * 0.1
-        self.sensors['COOLANT_TEMP'].value += heat_gen - cooling
-        temp_diff = self.sensors['COOLANT_TEMP'].value - self.sensors['OIL_TEMP'].value
-        self.sensors['OIL_TEMP'].value += temp_diff * 0.05
-        base_pressure = (self.sensors['RPM'].value / 1000) * 8 + 20
-        temp_factor = 1.0 - ((self.sensors['OIL_TEMP'].value - 80) / 200)
-        self.sensors['OIL_PRESSURE'].value = base_pressure * np.clip(temp_factor, 0.5, 1.5)
-        fuel = ((self.throttle / 100) * 12 + (self.sensors['RPM'].value / 1000) * 0.8)
-        self.sensors['FUEL_RATE'].value = fuel
-        if self.sensors['SPEED'].value > 0:
-            self.mileage += self.sensors['SPEED'].value / 3600
+        self.gear = 1 if gear < 1 else (6 if gear > 6 else int(gear))
+        self._mark_dirty()
+    def _mark_dirty(self):
+        self._dirty = True
+    def _update_sensors(self, dt: float = 1.0):
+        self.mileage += _update_sensors_nb(self.values, self.throttle, GEAR_RATIOS[self.gear], float(dt))
+        self._dirty = False
     def read_all_sensors(self) -> dict:
-        return {name: sensor.read() for name, sensor in self.sensors.items()}
+        """Take a noisy reading of every sensor; the returned dict is reused by the next call"""
+        if self._dirty:
+            self._update_sensors()
+        reading = self.reading
+        self._rng.random(out=reading)
+        reading *= _NOISE_SPAN
+        reading -= NOISE
+        reading += self.values
+        np.minimum(reading, HI, out=reading)
+        np.maximum(reading, LO, out=reading)
+        np.round(reading, 2, out=reading)
+        self.reading_timestamp = timestamp = datetime.now().isoformat()
+        for entry, value in zip(self._readout_entries, reading.tolist()):
+            entry['value'] = value
+            entry['timestamp'] = timestamp
+        return self._readout
     def get_status_summary(self) -> str:
         """Get human-readable status"""
-        rpm = self.sensors['RPM'].value
-        speed = self.sensors['SPEED'].value
-        temp = self.sensors['COOLANT_TEMP'].value
-        oil_pressure = self.sensors['OIL_PRESSURE'].value
+        if self._dirty:
+            self._update_sensors()
+        rpm = self.values[Sensor.RPM]
+        speed = self.values[Sensor.SPEED]
+        temp = self.values[Sensor.COOLANT_TEMP]
+        oil_pressure = self.values[Sensor.OIL_PRESSURE]
 
         return f"""
 ╔═══════════════════════════════════════════════════╗
@@ -105,71 +140,105 @@ class VirtualCarSimulator:
 
 
 class DigitalTwinTester:
-    def __init__(self):
+    # Per-tick report lines, formatted without rebuilding an f-string each time
+    _IDLE_LINE = "Second {}: RPM={}, Temp={:.1f}°C\n".format
+    _ACCEL_LINE = "Second {}: Throttle={}%, RPM={:.0f}, Speed={:.1f} km/h\n".format
+    _CRUISE_LINE = "Second {}: Speed={:.1f} km/h, Temp={:.1f}°C, Fuel={:.2f} L/h\n".format
+    _HIGH_LOAD_LINE = "Second {}: Load={:.1f}%, Temp={:.1f}°C, {}\n".format
+    def __init__(self, real_time: bool = True):
         self.car = VirtualCarSimulator()
-        self.history = []
+        # Pace the tests at one reading per second; disable for fast replays
+        self.real_time = real_time
+        # Numeric sensor history, one row per reading; grown by doubling
+        self.history = np.empty((64, len(Sensor)), dtype=np.float64)
+        self.history_len = 0
+        self.history_timestamps = []
+    def _record(self):
+        if self.history_len == len(self.history):
+            self.history = np.resize(self.history, (2 * len(self.history), len(Sensor)))
+        self.history[self.history_len] = self.car.reading
+        self.history_timestamps.append(self.car.reading_timestamp)
+        self.history_len += 1
+    def _tick(self, lines):
+        # In real time each line is shown as it happens; otherwise the
+        # whole test is written out in one go by _flush
+        if self.real_time:
+            self._flush(lines)
+            time.sleep(1)
+    @staticmethod
+    def _flush(lines):
+        sys.stdout.writelines(lines)
+        lines.clear()
     def test_idle(self, duration=5):
         print("\n TEST 1: Idle Engine")
         print("=" * 50)
         self.car.set_throttle(0)
+        lines = []
         for i in range(duration):
             data = self.car.read_all_sensors()
-            self.history.append(data)
-            print(f"Second {i + 1}: RPM={data['RPM']['value']}, Temp={data['COOLANT_TEMP']['value']:.1f}°C")
-            time.sleep(1)
+            self._record()
+            lines.append(self._IDLE_LINE(i + 1, data['RPM']['value'], data['COOLANT_TEMP']['value']))
+            self._tick(lines)
+        self._flush(lines)
     def test_acceleration(self, duration=10):
         print("\n TEST 2: Acceleration")
         print("=" * 50)
+        lines = []
         for i in range(duration):
             throttle = min(100, i * 10)
             self.car.set_throttle(throttle)
             data = self.car.read_all_sensors()
-            self.history.append(data)
-            print(
-                f"Second {i + 1}: Throttle={throttle}%, RPM={data['RPM']['value']:.0f}, Speed={data['SPEED']['value']:.1f} km/h")
-            time.sleep(1)
+            self._record()
+            lines.append(self._ACCEL_LINE(i + 1, throttle, data['RPM']['value'], data['SPEED']['value']))
+            self._tick(lines)
+        self._flush(lines)
     def test_steady_cruise(self, duration=10):
         print("\n TEST 3: Steady Cruise")
         print("=" * 50)
         self.car.set_throttle(50)
         self.car.set_gear(5)
+        lines = []
         for i in range(duration):
             data = self.car.read_all_sensors()
-            self.history.append(data)
-            print(
-                f"Second {i + 1}: Speed={data['SPEED']['value']:.1f} km/h, Temp={data['COOLANT_TEMP']['value']:.1f}°C, Fuel={data['FUEL_RATE']['value']:.2f} L/h")
-            time.sleep(1)
+            self._record()
+            lines.append(self._CRUISE_LINE(
+                i + 1, data['SPEED']['value'], data['COOLANT_TEMP']['value'], data['FUEL_RATE']['value']))
+            self._tick(lines)
+        self._flush(lines)
     def test_high_load(self, duration=8):
         print("\n TEST 4: High Load (Stress Test)")
         print("=" * 50)
         self.car.set_throttle(90)
         self.car.set_gear(3)
+        lines = []
         for i in range(duration):
             data = self.car.read_all_sensors()
-            self.history.append(data)
+            self._record()
+            load = data['ENGINE_LOAD']['value']
+            temp = data['COOLANT_TEMP']['value']
+            rpm = data['RPM']['value']
             warnings = []
-            if data['COOLANT_TEMP']['value'] > 100:
+            if temp > 100:
                 warnings.append("⚠️  HIGH TEMP")
-            if data['RPM']['value'] > 6000:
+            if rpm > 6000:
                 warnings.append("⚠️  HIGH RPM")
             warn_str = " ".join(warnings) if warnings else "✓ OK"
-            print(
-                f"Second {i + 1}: Load={data['ENGINE_LOAD']['value']:.1f}%, Temp={data['COOLANT_TEMP']['value']:.1f}°C, {warn_str}")
-            time.sleep(1)
+            lines.append(self._HIGH_LOAD_LINE(i + 1, load, temp, warn_str))
+            self._tick(lines)
+        self._flush(lines)
     def analyze_health(self):
         print("\n HEALTH ANALYSIS")
         print("=" * 50)
-        if not self.history:
+        if not self.history_len:
             print("No data collected")
             return
-        temps = [d['COOLANT_TEMP']['value'] for d in self.history]
-        rpms = [d['RPM']['value'] for d in self.history]
-        oil_pressures = [d['OIL_PRESSURE']['value'] for d in self.history]
-        avg_temp = np.mean(temps)
-        max_temp = np.max(temps)
-        avg_rpm = np.mean(rpms)
-        max_rpm = np.max(rpms)
-        min_oil_pressure = np.min(oil_pressures)
+        history = self.history[:self.history_len]
+        mins, maxs, means = history.min(0), history.max(0), history.mean(0)
+        avg_temp = means[Sensor.COOLANT_TEMP]
+        max_temp = maxs[Sensor.COOLANT_TEMP]
+        avg_rpm = means[Sensor.RPM]
+        max_rpm = maxs[Sensor.RPM]
+        min_oil_pressure = mins[Sensor.OIL_PRESSURE]
         print(f"Average Temperature:  {avg_temp:.1f}°C")
         print(f"Maximum Temperature:  {max_temp:.1f}°C")
         print(f"Average RPM:          {avg_rpm:.0f}")
@@ -211,12 +280,22 @@ class DigitalTwinTester:
             'test_timestamp': datetime.now().isoformat(),
             'vehicle_id': 'TEST_VEHICLE_001',
             'mileage': self.car.mileage,
-            'sensor_history': self.history
+            'sensor_history': [
+                {
+                    name: {'command': name, 'value': value, 'unit': unit, 'timestamp': timestamp}
+                    for name, unit, value in zip(NAMES, UNITS, row)
+                }
+                for row, timestamp in zip(self.history[:self.history_len].tolist(), self.history_timestamps)
+            ]
         }
-        with open(filename, 'w') as f:
-            json.dump(export, f, indent=2)
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(export, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(export, f)
 
-        print(f"✓ Exported {len(self.history)} data points")
+        print(f"✓ Exported {self.history_len} data points")
 
     def run_full_test_suite(self):
         print("\n" + "=" * 50)
@@ -224,16 +303,20 @@ class DigitalTwinTester:
         print("=" * 50)
 
         self.test_idle(duration=5)
-        time.sleep(1)
+        if self.real_time:
+            time.sleep(1)
 
         self.test_acceleration(duration=10)
-        time.sleep(1)
+        if self.real_time:
+            time.sleep(1)
 
         self.test_steady_cruise(duration=10)
-        time.sleep(1)
+        if self.real_time:
+            time.sleep(1)
 
         self.test_high_load(duration=8)
-        time.sleep(1)
+        if self.real_time:
+            time.sleep(1)
 
         print(self.car.get_status_summary())
 